@@ -15,6 +15,9 @@ from omuchat.chat.chat_extension import (
     RoomTableKey,
 )
 from omuchat.model.channel import Channel, ChannelJson
+from omuchat_python import install_uvloop
+
+install_uvloop()
 
 app = App(
     name="chat-service",
@@ -57,11 +60,14 @@ async def create_channel_tree(url: str) -> List[ChannelJson]:
         return []
     channels: List[Channel] = []
     providers = await chat.providers.fetch()
+    patterns = [
+        (provider, re.compile(provider.regex))
+        for provider in providers.values()
+        if provider.id != "misskey"
+    ]
     for result in results.to_list():
-        for provider in providers.values():
-            if provider.id == "misskey":
-                continue
-            if re.search(provider.regex, result.url) is None:
+        for provider, pattern in patterns:
+            if pattern.search(result.url) is None:
                 continue
             channels.append(
                 Channel(
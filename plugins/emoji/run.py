@@ -3,6 +3,9 @@ from dataclasses import dataclass
 from typing import Dict, TypedDict
 
 from omuchat import App, Client, model
+from omuchat_python import install_uvloop
+
+install_uvloop()
 
 APP = App(
     name="emoji",
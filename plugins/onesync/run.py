@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Dict, List, Set, TypedDict
+import json
+from typing import Awaitable, Callable, Dict, List, Tuple, TypedDict, TypeVar
 
 from aiohttp import web
+from loguru import logger
 
 from omuchat import App, Client, events, model
+from omuchat_python import install_uvloop
+
+install_uvloop()
 
 APP = App(
     name="onesync",
@@ -74,25 +79,74 @@ class Comment(TypedDict):
     serviceData: CommentServiceData
 
 
+COMMENT_COLOR: Color = {"r": 190, "g": 44, "b": 255}
+service_data_cache: Dict[str, CommentServiceData] = {}
+
+
+def get_service_data(room: model.Room) -> CommentServiceData:
+    key = room.key()
+    service_data = service_data_cache.get(key)
+    if (
+        service_data is None
+        or service_data["name"] != room.name
+        or service_data["url"] != room.url
+    ):
+        service_data = CommentServiceData(
+            id=key,
+            name=room.name,
+            url=room.url,
+            write=True,
+            speech=False,
+            options={},
+            enabled=False,
+            persist=False,
+            translate=[],
+            color=COMMENT_COLOR,
+        )
+        service_data_cache[key] = service_data
+    return service_data
+
+
 def format_content(content: model.ContentComponent | None) -> str:
     if not content:
         return ""
     parts = []
-    components = list(content.siblings or [content])
+    components = list(reversed(content.siblings or [content]))
     while components:
-        component = components.pop(0)
+        component = components.pop()
         if isinstance(component, model.TextContent):
             parts.append(component.text)
         elif isinstance(component, model.ImageContent):
             parts.append(f'<img src="{component.url}" alt="{component.id}" />')
         if component.siblings:
-            components.extend(component.siblings)
+            components.extend(reversed(component.siblings))
     return "".join(parts)
 
 
-async def to_comment(message: model.Message) -> Comment | None:
-    room = await client.chat.rooms.get(message.room_id)
-    author = message.author_id and await client.chat.authors.get(message.author_id)
+T = TypeVar("T")
+
+
+async def get_cached(
+    get: Callable[[str], Awaitable[T | None]],
+    key: str,
+    cache: Dict[str, asyncio.Future[T | None]] | None,
+) -> T | None:
+    if cache is None:
+        return await get(key)
+    if key not in cache:
+        cache[key] = asyncio.ensure_future(get(key))
+    return await cache[key]
+
+
+async def to_comment(
+    message: model.Message,
+    rooms: Dict[str, asyncio.Future[model.Room | None]] | None = None,
+    authors: Dict[str, asyncio.Future[model.Author | None]] | None = None,
+) -> Comment | None:
+    room = await get_cached(client.chat.rooms.get, message.room_id, rooms)
+    author = message.author_id and await get_cached(
+        client.chat.authors.get, message.author_id, authors
+    )
     if not room or not author:
         return None
     badges = []
@@ -109,7 +163,7 @@ async def to_comment(message: model.Message) -> Comment | None:
         service=room.provider_id,
         name=room.name,
         url=room.url,
-        color={"r": 190, "g": 44, "b": 255},
+        color=COMMENT_COLOR,
         data=CommentData(
             id=message.key(),
             liveId=room.id,
@@ -128,18 +182,7 @@ async def to_comment(message: model.Message) -> Comment | None:
             isFirstTime=False,
         ),
         meta={"no": 1, "tc": 1},
-        serviceData=CommentServiceData(
-            id=room.key(),
-            name=room.name,
-            url=room.url,
-            write=True,
-            speech=False,
-            options={},
-            enabled=False,
-            persist=False,
-            translate=[],
-            color={"r": 190, "g": 44, "b": 255},
-        ),
+        serviceData=get_service_data(room),
     )
 
 
@@ -147,16 +190,39 @@ class CommentsData(TypedDict):
     comments: List[Comment]
 
 
-sessions: Set[web.WebSocketResponse] = set()
+sessions: Tuple[web.WebSocketResponse, ...] = ()
+
+
+async def broadcast(data: str) -> None:
+    results = await asyncio.gather(
+        *(ws.send_str(data) for ws in sessions),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, ConnectionResetError):
+            continue
+        if isinstance(result, BaseException):
+            logger.opt(exception=result).error("Failed to broadcast to session")
+
+
+async def broadcast_comments(comments: List[Comment]) -> None:
+    await broadcast(
+        json.dumps({"type": "comments", "data": CommentsData(comments=comments)})
+    )
 
 
 async def handle(request: web.Request) -> web.WebSocketResponse:
+    global sessions
     ws = web.WebSocketResponse()
     await ws.prepare(request)
-    messages = [
-        await to_comment(message)
-        for message in (await client.chat.messages.fetch(before=35)).values()
-    ]
+    rooms: Dict[str, asyncio.Future[model.Room | None]] = {}
+    authors: Dict[str, asyncio.Future[model.Author | None]] = {}
+    messages = await asyncio.gather(
+        *(
+            to_comment(message, rooms, authors)
+            for message in (await client.chat.messages.fetch(before=35)).values()
+        )
+    )
 
     await ws.send_json(
         {
@@ -164,7 +230,7 @@ async def handle(request: web.Request) -> web.WebSocketResponse:
             "data": CommentsData(comments=[message for message in messages if message]),
         }
     )
-    sessions.add(ws)
+    sessions = (*sessions, ws)
     try:
         async for msg in ws:
             if msg.type == web.WSMsgType.TEXT:
@@ -172,7 +238,7 @@ async def handle(request: web.Request) -> web.WebSocketResponse:
             elif msg.type == web.WSMsgType.ERROR:
                 print("ws connection closed with exception %s" % ws.exception())
     finally:
-        sessions.remove(ws)
+        sessions = tuple(session for session in sessions if session is not ws)
     return ws
 
 
@@ -181,15 +247,7 @@ async def on_message_add(message: model.Message) -> None:
     comment = await to_comment(message)
     if not comment:
         return
-    for ws in sessions:
-        await ws.send_json(
-            {
-                "type": "comments",
-                "data": CommentsData(
-                    comments=[comment],
-                ),
-            }
-        )
+    await broadcast_comments([comment])
 
 
 @client.on(events.MessageUpdate)
@@ -197,21 +255,12 @@ async def on_message_update(message: model.Message) -> None:
     comment = await to_comment(message)
     if comment is None:
         return
-    for ws in sessions:
-        await ws.send_json(
-            {
-                "type": "comments",
-                "data": CommentsData(
-                    comments=[comment],
-                ),
-            }
-        )
+    await broadcast_comments([comment])
 
 
 @client.on(events.MessageDelete)
 async def on_message_delete(message: model.Message) -> None:
-    for ws in sessions:
-        await ws.send_json({"type": "deleted", "data": [message.key()]})
+    await broadcast(json.dumps({"type": "deleted", "data": [message.key()]}))
 
 
 async def main():
@@ -1,4 +1,8 @@
-from chatprovider import client
+from omuchat_python import install_uvloop
+
+install_uvloop()
+
+from chatprovider import client  # noqa: E402
 
 
 async def main():
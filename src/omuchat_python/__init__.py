@@ -1,2 +1,13 @@
+import asyncio
+
+
 def hello():
     return "Hello from omuchat-python!"
+
+
+def install_uvloop() -> None:
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())